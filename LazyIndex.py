@@ -0,0 +1,286 @@
+# All needed libraries
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+# Header of an index file: magic, size and mtime of the source file, number of entries and width of an ID
+INDEX_MAGIC = b"LTSIDX01"
+INDEX_HEADER = struct.Struct("<8sQqQQ")
+
+
+# Reads the ID of each line (first column) and its byte offset from the source file, skipping the header
+def scan_offsets(source_file):
+    offsets = {}
+
+    with open(source_file, 'rb') as file:  # Opens the file to read as bytes so offsets can be used with seek
+        offset = len(file.readline())  # Skips the header
+
+        # Iterates through each line in the file, only splitting off the ID column
+        for line in file:
+            record_id = line.split(b',', 1)[0].strip()
+            if record_id:  # Skips empty lines
+                offsets[record_id] = offset
+            offset += len(line)
+
+    return offsets
+
+
+# Writes the index file of 'offsets', scanned from a source file with the given os.stat result
+def write_offset_index(index_file, stat, offsets):
+    # IDs are padded with zero bytes to a width that keeps every entry 8 byte aligned
+    width = max((len(record_id) for record_id in offsets), default=0)
+    width = (width + 7) // 8 * 8
+
+    # Entries in file order, followed by the entry numbers sorted by ID for binary search
+    sorted_entries = array("Q", sorted(range(len(offsets)), key=list(offsets).__getitem__))
+
+    # Writes to a temporary file of its own, so processes indexing the same file at once don't clash
+    descriptor, temp_file = tempfile.mkstemp(dir=os.path.dirname(index_file) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets), width))
+            for record_id, offset in offsets.items():
+                file.write(record_id.ljust(width, b"\0"))
+                file.write(struct.pack("<Q", offset))
+            sorted_entries.tofile(file)
+        os.chmod(temp_file, 0o644)  # mkstemp only lets the owner read the file
+        os.replace(temp_file, index_file)  # Only replaces the index once it is complete
+    except OSError:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+
+'''
+Contract: Byte offset index of a txt file, saved next to it in an index file
+Purpose:
+    - Map the ID in the first column of each line to the byte offset of that line
+    - Reuse the index file while the size and modification time of the source file match,
+      otherwise scan the source file once and write a new index file
+    - Memory map the index file and find IDs by binary search, so opening it doesn't depend on its size
+    - Keep the scanned offsets in memory instead when the index file can't be written (e.g. read-only directory)
+'''
+
+
+class OffsetIndex:
+    def __init__(self, source_file, index_file=None):
+        # Initializes the index, 'index_file' defaults to the source file name followed by '.idx'
+        self.index_file = index_file if index_file is not None else source_file + ".idx"
+        self.offsets = None  # Scanned offsets, only used when the index file can't be written
+        self.map = None
+
+        if not self._is_current(source_file):
+            stat = os.stat(source_file)  # Taken before the scan, so a file changed meanwhile is indexed again
+            offsets = scan_offsets(source_file)
+            try:
+                write_offset_index(self.index_file, stat, offsets)
+            except OSError:
+                # Another process may have written the index first, otherwise the offsets stay in memory
+                if not self._is_current(source_file):
+                    self.offsets = offsets
+                    return
+
+        # Maps the index file and reads its header
+        with open(self.index_file, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, self.count, self.width = INDEX_HEADER.unpack_from(self.map)
+        self.stride = self.width + 8  # Size of one entry, the ID followed by its offset
+        self.entries_start = INDEX_HEADER.size
+        sorted_start = self.entries_start + self.count * self.stride
+        self.sorted_entries = memoryview(self.map)[sorted_start:sorted_start + self.count * 8].cast("Q")
+
+    # Checks if the index file exists and was written for the current version of the source file
+    def _is_current(self, source_file):
+        try:
+            with open(self.index_file, 'rb') as file:
+                header = file.read(INDEX_HEADER.size)
+        except OSError:
+            return False
+
+        if len(header) != INDEX_HEADER.size:
+            return False
+        magic, size, mtime_ns, _, _ = INDEX_HEADER.unpack(header)
+        stat = os.stat(source_file)
+        return magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+    # Returns the padded ID of the given entry
+    def _entry_id(self, entry):
+        start = self.entries_start + entry * self.stride
+        return self.map[start:start + self.width]
+
+    # Returns the byte offset of the given ID, or None if the ID isn't in the source file
+    def offset(self, record_id):
+        if not isinstance(record_id, str):  # IDs are always strings
+            return None
+        key = record_id.encode()
+        if self.offsets is not None:
+            return self.offsets.get(key)
+        if len(key) > self.width:
+            return None
+        key = key.ljust(self.width, b"\0")
+
+        # Binary search through the entries sorted by ID
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry_id(self.sorted_entries[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.count:
+            entry = self.sorted_entries[low]
+            if self._entry_id(entry) == key:
+                return struct.unpack_from("<Q", self.map, self.entries_start + entry * self.stride + self.width)[0]
+        return None
+
+    # Iterates through the IDs in file order
+    def __iter__(self):
+        if self.offsets is not None:
+            yield from (record_id.decode() for record_id in self.offsets)
+            return
+        for entry in range(self.count):
+            yield self._entry_id(entry).rstrip(b"\0").decode()
+
+    def __len__(self):
+        return len(self.offsets) if self.offsets is not None else self.count
+
+    # Unmaps the index file
+    def close(self):
+        if self.map is not None:
+            self.sorted_entries.release()
+            self.map.close()
+            self.map = None
+
+
+'''
+Contract: Dictionary of vehicles or routes that builds each object from its source txt file on first access
+Purpose:
+    - Find the line of an object through an OffsetIndex instead of building every object at startup
+    - Hydrate an object by seeking to its line and parsing it only when it is accessed
+    - Keep at most 'cache_size' hydrated objects, evicting the least recently used one
+    - Save the state of an evicted object that was changed or added ('save_state') in an override table,
+      the object is rebuilt from it ('load_state') instead of from the source file when accessed again.
+      The table holds one small tuple per changed object, it isn't bounded by 'cache_size' and grows to the
+      whole fleet once every vehicle has moved
+    - Return the same object again after eviction while it is still referenced elsewhere (e.g. by a route),
+      its changes are saved the next time it is evicted. Changes made to such an object after its eviction
+      are lost if it is released before the map returns it again, so change objects through the manager
+'''
+
+
+class LazyRecordMap(MutableMapping):
+    def __init__(self, source_file, parse_line, save_state, load_state, cache_size=1024, index_file=None):
+        # Initializes the map with the source file, the functions that build and save objects and the cache size
+        self.source_file = source_file
+        self.parse_line = parse_line
+        self.save_state = save_state
+        self.load_state = load_state
+        self.cache_size = cache_size
+        self.index = OffsetIndex(source_file, index_file)  # Byte offset of each ID in the source file
+        self.cache = OrderedDict()  # Hydrated objects and their state when hydrated, the least recently used first
+        self.overrides = {}  # Saved state of changed or added objects, one entry per changed object
+        self.added = {}  # IDs added that aren't in the source file, in the order they were added
+        self.removed = set()  # IDs of the source file that were removed
+        self.released = weakref.WeakValueDictionary()  # Evicted objects that are still referenced
+        self.lock = threading.RLock()  # Lock for thread safety
+        self.file = None  # Source file, opened on the first hydration
+
+    # Returns the object with the given ID, hydrating it if needed
+    def __getitem__(self, record_id):
+        with self.lock:  # Locks thread for safety
+            # Checks the cache and marks the object as the most recently used
+            if record_id in self.cache:
+                self.cache.move_to_end(record_id)
+                return self.cache[record_id][0]
+            if record_id not in self:
+                raise KeyError(record_id)
+
+            # Reuses an evicted object that is still alive, otherwise rebuilds it from its saved state or its line
+            record = self.released.pop(record_id, None)
+            if record is not None:
+                hydrated_state = None  # Its state is unknown, so it is saved again on eviction
+            elif record_id in self.overrides:
+                hydrated_state = self.overrides[record_id]
+                record = self.load_state(hydrated_state)
+            else:
+                record = self.parse_line(self._read_line(record_id))
+                hydrated_state = self.save_state(record)
+
+            self._cache_record(record_id, record, hydrated_state)
+            return record
+
+    # Reads the line of the given ID from the source file
+    def _read_line(self, record_id):
+        if self.file is None:
+            self.file = open(self.source_file, 'rb')
+        self.file.seek(self.index.offset(record_id))
+        return self.file.readline().decode()
+
+    # Adds the object to the cache and evicts the least recently used objects
+    def _cache_record(self, record_id, record, hydrated_state):
+        self.cache[record_id] = (record, hydrated_state)
+        while len(self.cache) > self.cache_size:
+            evicted_id, (evicted, evicted_state) = self.cache.popitem(last=False)
+
+            # Saves the state of the evicted object if it changed since it was hydrated
+            state = self.save_state(evicted)
+            if state != evicted_state:
+                self.overrides[evicted_id] = state
+            self.released[evicted_id] = evicted
+
+    # Adds or replaces an object
+    def __setitem__(self, record_id, record):
+        with self.lock:  # Locks thread for safety
+            if self.index.offset(record_id) is None:
+                self.added[record_id] = None
+            self.removed.discard(record_id)
+            self.released.pop(record_id, None)
+            self.overrides.pop(record_id, None)
+            self.cache.pop(record_id, None)
+            self._cache_record(record_id, record, None)  # Saved on eviction as it can't be read from the file
+
+    # Removes an object
+    def __delitem__(self, record_id):
+        with self.lock:  # Locks thread for safety
+            if record_id not in self:
+                raise KeyError(record_id)
+            if record_id in self.added:
+                del self.added[record_id]
+            else:
+                self.removed.add(record_id)
+            self.cache.pop(record_id, None)
+            self.overrides.pop(record_id, None)
+            self.released.pop(record_id, None)
+
+    # Checks if the ID exists without hydrating its object
+    def __contains__(self, record_id):
+        with self.lock:  # Locks thread for safety
+            if record_id in self.added:
+                return True
+            return record_id not in self.removed and self.index.offset(record_id) is not None
+
+    # Iterates through the IDs in file order, followed by the IDs added afterwards
+    def __iter__(self):
+        with self.lock:  # Locks thread for safety
+            record_ids = [record_id for record_id in self.index if record_id not in self.removed]
+            record_ids.extend(self.added)
+        return iter(record_ids)
+
+    def __len__(self):
+        with self.lock:  # Locks thread for safety
+            return len(self.index) - len(self.removed) + len(self.added)
+
+    # Closes the source file and the index
+    def close(self):
+        with self.lock:  # Locks thread for safety
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.index.close()
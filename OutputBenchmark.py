@@ -0,0 +1,74 @@
+# All needed libraries
+import io
+import subprocess
+import sys
+import threading
+import time
+
+# Importing the manager and the output sinks
+from TransportManager import *
+from StatusOutput import ConsoleSink, JsonLinesSink, CsvSink
+
+'''
+Contract: Benchmark the update throughput of the TransportManager with different output sinks
+Purpose:
+    - Compare vehicle updates per second with console printing against the buffered sinks
+    - Turn off the movement txt files so only the cost of the output is measured
+    - Run the updates on one thread and on several threads competing for the manager lock
+    - Write every sink to the same pipe read by a child process, printing is line buffered like on a terminal
+'''
+
+
+# Runs 'updates' location updates spread across 'vehicle_count' vehicles and 'threads' threads,
+# returns updates per second
+def run_benchmark(output, vehicle_count=100, updates=20000, threads=1):
+    manager = TransportManager(output)
+    manager.save_movements = False  # Measures the output only, not the movement txt files
+
+    # Adds the vehicles to the manager
+    vehicle_ids = [f"V{i}" for i in range(vehicle_count)]
+    for vehicle_id in vehicle_ids:
+        manager.add_vehicle(Transport(vehicle_id, "Bus", (40.0, -74.0), "OnTime"))
+
+    # Each thread updates every 'threads'-th vehicle location
+    def update_locations(first):
+        for i in range(first, updates, threads):
+            manager.update_and_save_vehicle_location(vehicle_ids[i % vehicle_count], (40.0 + i * 1e-6, -74.0))
+
+    update_threads = [threading.Thread(target=update_locations, args=(first,)) for first in range(threads)]
+
+    # Times the location updates and the final flush of the sink
+    start = time.perf_counter()
+    for update_thread in update_threads:
+        update_thread.start()
+    for update_thread in update_threads:
+        update_thread.join()
+    output.flush()
+    elapsed = time.perf_counter() - start
+
+    return updates / elapsed
+
+
+if __name__ == "__main__":
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000  # The amount of updates for each run
+
+    # Starts a child process that reads and discards everything written to its stdin
+    reader = subprocess.Popen([sys.executable, "-c", "import sys\nwhile sys.stdin.buffer.read(65536): pass"],
+                              stdin=subprocess.PIPE)
+    pipe = io.TextIOWrapper(reader.stdin, line_buffering=True)  # Flushes on every printed line
+
+    sinks = [
+        ("console (print)", lambda: ConsoleSink(stream=pipe)),
+        ("JSON Lines (buffered)", lambda: JsonLinesSink(pipe)),
+        ("CSV (buffered)", lambda: CsvSink(pipe)),
+    ]
+
+    # Prints the throughput of each sink with one thread and with eight threads competing for the lock
+    print(f"{'Sink':<24} {'1 thread':>16} {'8 threads':>16}")
+    for name, create_sink in sinks:
+        single = run_benchmark(create_sink(), updates=updates)
+        contended = run_benchmark(create_sink(), updates=updates, threads=8)
+        print(f"{name:<24} {single:>10,.0f} upd/s {contended:>10,.0f} upd/s")
+
+    pipe.close()
+    reader.wait()
@@ -0,0 +1,40 @@
+'''
+Contract: Record the inputs of each simulation tick to a trace file
+Purpose:
+    - Save every generated vehicle location with its tick so a run can be replayed later
+    - Write the locations with repr() so the replayed coordinates are bit-identical to the recorded ones
+    - Use the same comma separated layout with a header line as the other txt files of the system
+'''
+
+
+class TraceRecorder:
+    def __init__(self, trace_file):
+        # Initializes the recorder by creating the trace file and writing its header
+        self.trace_file = trace_file
+        self.file = open(trace_file, "w")
+        self.file.write("Tick, VehicleID, LocationLat, LocationLong\n")
+
+    # Records the location generated for a vehicle during the given tick
+    def record(self, tick, vehicle_id, new_location):
+        self.file.write(f"{tick},{vehicle_id},{new_location[0]!r},{new_location[1]!r}\n")
+
+    # Closes the trace file
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Reads a trace file and yields the tick, vehicle ID and location of each recorded movement
+def read_trace(trace_file):
+    with open(trace_file, 'r') as file:  # Opens the file to read
+        next(file)  # Skips the header
+
+        # Iterates through each line in the file
+        for line in file:
+            tick, vehicle_id, location_lat, location_long = line.strip().split(',')
+            yield int(tick), vehicle_id, (float(location_lat), float(location_long))
@@ -0,0 +1,237 @@
+# All needed libraries
+import csv
+import io
+import json
+import sys
+import threading
+from abc import ABC, abstractmethod
+
+# Verbosity levels, a record is only written when its level is at or below the sink's verbosity
+QUIET = 0  # Only errors such as unknown vehicle or route IDs
+NORMAL = 1  # Vehicle movements and route status
+VERBOSE = 2  # Everything, including update dispatch messages
+
+# Columns used when writing records as CSV
+CSV_FIELDS = ["event", "vehicle_id", "route_id", "name", "lat", "long", "status"]
+
+encode_json = json.JSONEncoder().encode  # Shared encoder, skips the argument handling of json.dumps
+
+'''
+Contract: Base class for every output sink used by the TransportManager
+Purpose:
+    - Receive status records (dictionaries) from the TransportManager
+    - Filter records by verbosity level before they are written
+    - Keep writes thread safe with a lock owned by the sink, not the manager
+    - Ignore records emitted after the sink is closed, e.g. by update threads that weren't joined
+'''
+
+
+class OutputSink(ABC):
+    def __init__(self, verbosity=NORMAL):
+        # Initializes the sink with a verbosity level and its own lock
+        self.verbosity = verbosity
+        self.lock = threading.Lock()
+        self.closed = False
+
+    # Writes the record if its level is allowed by the sink verbosity
+    def emit(self, record, level=NORMAL):
+        if level > self.verbosity:  # Skips records that are too detailed for this sink
+            return
+        with self.lock:  # Locks thread for safety
+            if not self.closed:
+                self.write_record(record)
+
+    # Writes a single record, implemented by each sink
+    @abstractmethod
+    def write_record(self, record):
+        pass
+
+    # Pushes any buffered records to their destination
+    def flush(self):
+        pass
+
+    # Flushes the sink before it is discarded, closing it more than once does nothing
+    def close(self):
+        self.flush()
+        with self.lock:  # Locks thread for safety
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+'''
+Contract: Print records to the console in the original human readable format
+Purpose:
+    - Keep the classic print() output of the TransportManager available as an optional sink
+'''
+
+
+class ConsoleSink(OutputSink):
+    def __init__(self, verbosity=NORMAL, stream=None):
+        # Initializes the sink, stream defaults to sys.stdout at the time of printing
+        super().__init__(verbosity)
+        self.stream = stream
+
+    # Prints the record as a line of text
+    def write_record(self, record):
+        print(format_record(record), file=self.stream if self.stream is not None else sys.stdout)
+
+
+'''
+Contract: Collect records in memory
+Purpose:
+    - Return status records to the caller instead of writing them anywhere
+'''
+
+
+class MemorySink(OutputSink):
+    def __init__(self, verbosity=NORMAL):
+        # Initializes the sink with an empty list of records
+        super().__init__(verbosity)
+        self.records = []
+
+    # Stores the record in the list
+    def write_record(self, record):
+        self.records.append(record)
+
+
+'''
+Contract: Base class for sinks that buffer records and write them in batches
+Purpose:
+    - Keep the emitted records in a list instead of writing one line at a time
+    - Serialize and write a batch once it holds 'buffer_size' records, or on flush/close
+    - Serialize full batches outside of the sink lock so other threads can keep emitting,
+      a second lock keeps the batches in order. Records must not be changed after they are emitted
+    - Accept either an open text stream or a file path as destination
+'''
+
+
+class BufferedSink(OutputSink):
+    def __init__(self, destination, verbosity=NORMAL, buffer_size=1000):
+        # Initializes the sink with a destination and the amount of records to buffer
+        super().__init__(verbosity)
+        self.buffer_size = buffer_size
+        self.records = []  # Records waiting to be written
+        self.write_lock = threading.Lock()  # Held while a batch is written, keeps batches in order
+
+        # Opens the file when a path is given, otherwise writes to the given stream
+        if isinstance(destination, str):
+            self.stream = open(destination, "w", newline="")
+            self.owns_stream = True
+        else:
+            self.stream = destination
+            self.owns_stream = False
+
+    # Buffers the record and writes the batch once it is full
+    def emit(self, record, level=NORMAL):
+        if level > self.verbosity:  # Skips records that are too detailed for this sink
+            return
+        with self.lock:  # Locks thread for safety
+            if self.closed:
+                return
+            self.write_record(record)
+            if len(self.records) < self.buffer_size:  # Checks if the buffer is full
+                return
+            batch = self._take_batch()
+
+        self._write_batch(batch)  # Serializes the batch once the sink lock is released
+
+    # Adds the record to the buffer
+    def write_record(self, record):
+        self.records.append(record)
+
+    # Serializes a batch of records into text, implemented by each format
+    @abstractmethod
+    def serialize(self, records):
+        pass
+
+    # Empties the buffer and returns its records, must be called while holding the sink lock
+    def _take_batch(self):
+        batch = self.records
+        self.records = []
+        self.write_lock.acquire()  # Taken before the sink lock is released so batches are written in order
+        return batch
+
+    # Writes a batch taken by _take_batch to the destination
+    def _write_batch(self, batch):
+        try:
+            if batch:
+                self.stream.write(self.serialize(batch))
+        finally:
+            self.write_lock.release()
+
+    def flush(self):
+        with self.lock:  # Locks thread for safety
+            if not self.closed:
+                self._write_batch(self._take_batch())
+                self.stream.flush()
+
+    def close(self):
+        with self.lock:  # Locks thread for safety
+            if self.closed:
+                return
+            self._write_batch(self._take_batch())
+            self.stream.flush()
+            if self.owns_stream:  # Only closes files that the sink opened itself
+                self.stream.close()
+            self.closed = True
+
+
+'''
+Contract: Write records as JSON Lines
+Purpose:
+    - Serialize each record as one JSON object per line
+    - Encoding JSON costs more per record than CSV, use CsvSink when throughput matters most
+'''
+
+
+class JsonLinesSink(BufferedSink):
+    # Serializes the batch as JSON lines
+    def serialize(self, records):
+        return "".join([encode_json(record) + "\n" for record in records])
+
+
+'''
+Contract: Write records as CSV
+Purpose:
+    - Serialize each record as a CSV row using the columns in CSV_FIELDS
+    - Write the header row directly to the destination when the sink is created
+    - The fastest buffered sink, as the csv module writes a whole batch in a single call
+'''
+
+
+class CsvSink(BufferedSink):
+    def __init__(self, destination, verbosity=NORMAL, buffer_size=1000):
+        super().__init__(destination, verbosity, buffer_size)
+        csv.DictWriter(self.stream, fieldnames=CSV_FIELDS).writeheader()  # Header isn't counted as a record
+
+    # Serializes the batch as CSV rows
+    def serialize(self, records):
+        rows = io.StringIO()
+        csv.DictWriter(rows, fieldnames=CSV_FIELDS, extrasaction="ignore").writerows(records)
+        return rows.getvalue()
+
+
+# Formats a record as the line the TransportManager used to print
+def format_record(record):
+    event = record["event"]
+
+    if event == "vehicle_moved":
+        return f"Vehicle {record['vehicle_id']} moved to: Lat: {record['lat']}, Long: {record['long']}"
+    if event == "vehicle_status":
+        return (f"Vehicle ID: {record['vehicle_id']}, Location: ({record['lat']}, {record['long']}), "
+                f"Status: {record['status']}")
+    if event == "route_status":
+        return f"Route: {record['name']}"
+    if event == "vehicle_updating":
+        return f"Updating location for vehicle {record['vehicle_id']}"
+    if event == "vehicle_not_found":
+        return f"Vehicle {record['vehicle_id']} not found"
+    if event == "route_not_found":
+        return "Route ID not found"
+
+    return json.dumps(record)  # Falls back to JSON for unknown events
@@ -0,0 +1,185 @@
+# All needed libraries
+import os
+import sys
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088  # Mean radius of the earth
+TICK_SECONDS = 5.0  # Time between two simulation ticks, matches the sleep of the TransportManager main loop
+MAX_SPEED_KMH = 250.0  # Segments faster than this are reported as impossible jumps
+
+# Pattern of a line in the movement txt files written by the TransportManager
+MOVEMENT_PATTERN = r"Moved from Lat: ([^,\s]+), Long: ([^,\s]+) to Lat: ([^,\s]+), Long: ([^,\s]+)"
+MOVEMENT_DTYPE = [("from_lat", float), ("from_long", float), ("to_lat", float), ("to_long", float)]
+TRACE_DTYPE = [("tick", np.int64), ("vehicle_id", "U64"), ("lat", float), ("long", float)]
+
+# Columns of the tables returned by fleet_summary and find_anomalies
+SUMMARY_DTYPE = [("vehicle_id", object), ("segments", np.int64), ("distance_km", float),
+                 ("avg_speed_kmh", float), ("max_speed_kmh", float), ("anomalies", np.int64)]
+ANOMALY_DTYPE = [("vehicle_id", object), ("from_lat", float), ("from_long", float), ("to_lat", float),
+                 ("to_long", float), ("distance_km", float), ("speed_kmh", float)]
+
+'''
+Contract: Movement history of the fleet stored as NumPy arrays, one entry per segment between two fixes
+Purpose:
+    - Hold the start and end coordinates and the duration of every segment
+    - Link each segment to its vehicle through an index into 'vehicle_ids'
+'''
+
+
+class MovementSegments:
+    def __init__(self, vehicle_ids, vehicle_index, from_lat, from_long, to_lat, to_long, duration):
+        # Initializes the segments with their vehicle and coordinates, duration is in seconds
+        self.vehicle_ids = vehicle_ids  # Array of the vehicle IDs
+        self.vehicle_index = vehicle_index  # Index into vehicle_ids of each segment
+        self.from_lat = from_lat
+        self.from_long = from_long
+        self.to_lat = to_lat
+        self.to_long = to_long
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.vehicle_index)
+
+
+# Loads the movement txt files of a directory, every line is one tick of 'tick_seconds'
+def load_movement_logs(log_dir="vehicle_movements", tick_seconds=TICK_SECONDS):
+    suffix = "_movements.txt"
+    vehicle_ids = []
+    movements = []
+
+    # Parses each vehicle's file with a single regex pass instead of a Python loop per line
+    for file_name in sorted(os.listdir(log_dir)):
+        if file_name.endswith(suffix):
+            vehicle_ids.append(file_name[:-len(suffix)])
+            movements.append(np.fromregex(os.path.join(log_dir, file_name), MOVEMENT_PATTERN, MOVEMENT_DTYPE))
+
+    counts = [len(vehicle_movements) for vehicle_movements in movements]
+    movements = np.concatenate(movements) if movements else np.empty(0, MOVEMENT_DTYPE)
+
+    return MovementSegments(np.array(vehicle_ids, dtype=object),
+                            np.repeat(np.arange(len(vehicle_ids)), counts),
+                            movements["from_lat"], movements["from_long"], movements["to_lat"], movements["to_long"],
+                            np.full(len(movements), float(tick_seconds)))
+
+
+# Loads a trace file recorded by the TraceRecorder, a segment joins two consecutive fixes of the same vehicle.
+# The trace only holds generated locations, so the first move of each vehicle (from its starting location to tick 0)
+# is only included when 'vehicle_file' (e.g. Vehicle.txt) provides the starting locations
+def load_trace(trace_file, tick_seconds=TICK_SECONDS, vehicle_file=None):
+    # Checks for a trace without any movements, which loadtxt would warn about
+    with open(trace_file, 'r') as file:
+        file.readline()  # Skips the header
+        has_fixes = bool(file.readline().strip())
+
+    fixes = np.loadtxt(trace_file, delimiter=",", skiprows=1, ndmin=1, dtype=TRACE_DTYPE) if has_fixes \
+        else np.empty(0, dtype=TRACE_DTYPE)
+
+    # Adds the starting location of each vehicle as a fix one tick before the first tick
+    if vehicle_file is not None:
+        vehicles = np.loadtxt(vehicle_file, delimiter=",", skiprows=1, ndmin=1, usecols=(0, 2, 3),
+                              dtype=[("vehicle_id", "U64"), ("lat", float), ("long", float)])
+        start_fixes = np.empty(len(vehicles), dtype=TRACE_DTYPE)
+        start_fixes["tick"] = -1
+        for field in ("vehicle_id", "lat", "long"):
+            start_fixes[field] = vehicles[field]
+        fixes = np.concatenate((start_fixes, fixes))
+
+    # Sorts the fixes by vehicle and then by tick
+    vehicle_ids, vehicle_index = np.unique(fixes["vehicle_id"], return_inverse=True)
+    order = np.lexsort((fixes["tick"], vehicle_index))
+    fixes = fixes[order]
+    vehicle_index = vehicle_index[order]
+
+    # Keeps the pairs of consecutive fixes that belong to the same vehicle
+    same_vehicle = vehicle_index[1:] == vehicle_index[:-1]
+    start = np.flatnonzero(same_vehicle)
+    end = start + 1
+
+    return MovementSegments(vehicle_ids.astype(object), vehicle_index[start],
+                            fixes["lat"][start], fixes["long"][start], fixes["lat"][end], fixes["long"][end],
+                            (fixes["tick"][end] - fixes["tick"][start]) * float(tick_seconds))
+
+
+# Returns the great circle distance in km between arrays of coordinates given in degrees
+def haversine_km(from_lat, from_long, to_lat, to_long):
+    from_lat, from_long, to_lat, to_long = map(np.radians, (from_lat, from_long, to_lat, to_long))
+    a = (np.sin((to_lat - from_lat) / 2) ** 2
+         + np.cos(from_lat) * np.cos(to_lat) * np.sin((to_long - from_long) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# Yields the distance and speed of the segments in batches of 'batch_size' to bound memory use
+def _segment_batches(segments, batch_size):
+    for start in range(0, len(segments), batch_size):
+        batch = slice(start, start + batch_size)
+        distance = haversine_km(segments.from_lat[batch], segments.from_long[batch],
+                                segments.to_lat[batch], segments.to_long[batch])
+
+        # Speed in km/h, a move in zero time has an infinite speed
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = distance / (segments.duration[batch] / 3600.0)
+        speed[distance == 0] = 0.0
+
+        yield batch, distance, speed
+
+
+# Returns one row per vehicle with its distance traveled, average and max speed and number of impossible jumps
+def fleet_summary(segments, max_speed_kmh=MAX_SPEED_KMH, batch_size=1_000_000):
+    vehicle_count = len(segments.vehicle_ids)
+    distance_km = np.zeros(vehicle_count)
+    max_speed = np.zeros(vehicle_count)
+    anomalies = np.zeros(vehicle_count, dtype=np.int64)
+
+    # Accumulates the totals of each vehicle batch by batch
+    for batch, distance, speed in _segment_batches(segments, batch_size):
+        index = segments.vehicle_index[batch]
+        distance_km += np.bincount(index, weights=distance, minlength=vehicle_count)
+        np.maximum.at(max_speed, index, speed)
+        anomalies += np.bincount(index, weights=speed > max_speed_kmh, minlength=vehicle_count).astype(np.int64)
+
+    # Average speed is the total distance over the total time of each vehicle
+    hours = np.bincount(segments.vehicle_index, weights=segments.duration, minlength=vehicle_count) / 3600.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_speed = np.where(hours > 0, distance_km / hours, 0.0)
+
+    summary = np.empty(vehicle_count, dtype=SUMMARY_DTYPE)
+    summary["vehicle_id"] = segments.vehicle_ids
+    summary["segments"] = np.bincount(segments.vehicle_index, minlength=vehicle_count)
+    summary["distance_km"] = distance_km
+    summary["avg_speed_kmh"] = avg_speed
+    summary["max_speed_kmh"] = max_speed
+    summary["anomalies"] = anomalies
+    return summary
+
+
+# Returns one row per segment that is faster than 'max_speed_kmh'
+def find_anomalies(segments, max_speed_kmh=MAX_SPEED_KMH, batch_size=1_000_000):
+    tables = []
+
+    # Keeps the impossible jumps of each batch
+    for batch, distance, speed in _segment_batches(segments, batch_size):
+        flagged = np.flatnonzero(speed > max_speed_kmh)
+        index = batch.start + flagged  # Position of the flagged segments in the whole fleet
+
+        table = np.empty(len(flagged), dtype=ANOMALY_DTYPE)
+        table["vehicle_id"] = segments.vehicle_ids[segments.vehicle_index[index]]
+        table["from_lat"] = segments.from_lat[index]
+        table["from_long"] = segments.from_long[index]
+        table["to_lat"] = segments.to_lat[index]
+        table["to_long"] = segments.to_long[index]
+        table["distance_km"] = distance[flagged]
+        table["speed_kmh"] = speed[flagged]
+        tables.append(table)
+
+    return np.concatenate(tables) if tables else np.empty(0, dtype=ANOMALY_DTYPE)
+
+
+if __name__ == "__main__":
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else "vehicle_movements"  # Directory of the movement txt files
+
+    # Prints the summary of each vehicle in the movement logs
+    print(f"{'Vehicle':<10} {'Segments':>8} {'Distance km':>12} {'Avg km/h':>10} {'Max km/h':>10} {'Anomalies':>9}")
+    for row in fleet_summary(load_movement_logs(log_dir)):
+        print(f"{row['vehicle_id']:<10} {row['segments']:>8} {row['distance_km']:>12.1f} "
+              f"{row['avg_speed_kmh']:>10.1f} {row['max_speed_kmh']:>10.1f} {row['anomalies']:>9}")
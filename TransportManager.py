@@ -6,12 +6,20 @@ import os
 
 # Importing all classes and functions from Transport
 from Transport import *
+from StatusOutput import ConsoleSink, QUIET, NORMAL, VERBOSE
+from SimulationTrace import read_trace
+from LazyIndex import LazyRecordMap
 
 '''
 Contract:
         routes (dictionary): Stores routes within the transportation system by their own 'route_ID'
         vehicles (dictionary): Stores vehicles within the transportation system by their own 'vehicle_ID'
         stops (dictionary): Stores stops within the transportation system by their own 'stop_ID'
+        output (OutputSink): Receives the route and vehicle status records, prints to the console by default
+        log_dir (string): Directory where the movement txt files of each vehicle are saved
+        save_movements (bool): Saves each movement to the txt file of the vehicle when True
+        seed: Seed of the simulation, each vehicle gets its own random generator derived from it
+        trace (TraceRecorder): Records the locations generated by each simulation tick when set
 
 Purpose: Manage transportation routes, vehicles and stops to simulate a real-life public transportation network 
          Has functions to add/remove vehicles and routes. Updates vehicle locations and saves movements utilizing thread
@@ -27,19 +35,31 @@ Methods
         update_vehicle_location: Updates the vehicle location through a thread
         update_and_save_vehicle_location: Updates and records the movement of vehicles location in a txt file
         display_route_status: Displays the status of a given route through a thread
+        get_route_status: Returns the status records of a given route
+        get_vehicle_status: Returns the status record of a given vehicle
         search_stop: Search for a stop by it's name or stop_ID
         search_route: Search for a route by it's name or route_ID
         simulate_vehicle_movement: Simulates vehicle movements by randomly generating new coordinates for it's location
+        seed_vehicle: Sets the seed of the random generator of a single vehicle
+        replay_trace: Re-applies the vehicle movements recorded in a trace file
+        close: Flushes and closes the output sink, the trace and the files of a lazy manager
 '''
 
 
 class TransportManager:
 
     # Initialization of the TransportManager class
-    def __init__(self):
+    def __init__(self, output=None, seed=None, trace=None):
         self.routes = {}  # Dictionary to hold routes
         self.vehicles = {}  # Dictionary to hold vehicles
         self.lock = threading.Lock()  # Lock for thread safety
+        self.output = output if output is not None else ConsoleSink()  # Sink for status records
+        self.log_dir = "vehicle_movements"  # Directory to save the movement txt files
+        self.save_movements = True  # Whether movements are saved to the txt files
+        self.seed = seed  # Seed of the simulation, None uses the global random module
+        self.random_generators = {}  # Random generator of each vehicle when the simulation is seeded
+        self.trace = trace  # Trace recorder for the simulation ticks
+        self.tick = 0  # Number of simulation ticks run so far
 
     # Saves the vehicle movement to a file
     def save_vehicle_movement(self, vehicle_id, new_location):
@@ -93,6 +113,7 @@ class TransportManager:
 
             # Update the vehicle location using multi-threading
             threading.Thread(target=self.update_and_save_vehicle_location, args=(vehicle_id, new_location)).start()
+            self.output.emit({"event": "vehicle_updating", "vehicle_id": vehicle_id}, VERBOSE)
             return f"Updating location for vehicle {vehicle_id}"  # Returns message updating the vehicle
 
         else:
@@ -106,44 +127,81 @@ class TransportManager:
                 current_location = vehicle.get_current_location()  # Gets the current location of the vehicle
                 vehicle.set_current_location(new_location)  # Updates the vehicle location to its updated position
 
-                # Prints the updated vehicle location from last location to now
-                print(f"Vehicle {vehicle_id} moved to: Lat: {new_location[0]}, Long: {new_location[1]}")
+                # Record of the updated vehicle location, emitted once the lock is released
+                record = {"event": "vehicle_moved", "vehicle_id": vehicle_id,
+                          "lat": new_location[0], "long": new_location[1]}
+                level = NORMAL
 
                 # Save the movements to a text file
-                log_dir = "vehicle_movements"  # File to save the movement txt files
-                if not os.path.exists(log_dir):  # Checks if the directory exists
-                    os.makedirs(log_dir)  # Creates the directory if it doesn't exist
-
-                # Opens and creates a save txt file for the given vehicle
-                with open(os.path.join(log_dir, f"{vehicle_id}_movements.txt"), "a") as save_file:
-                    # Appends the movement log into the vehicles own txt file
-                    save_file.write(
-                        f"Moved from Lat: {current_location[0]}, Long: {current_location[1]} to Lat: {new_location[0]}, Long: {new_location[1]}\n")
+                if self.save_movements:
+                    log_dir = self.log_dir  # File to save the movement txt files
+                    if not os.path.exists(log_dir):  # Checks if the directory exists
+                        os.makedirs(log_dir)  # Creates the directory if it doesn't exist
+
+                    # Opens and creates a save txt file for the given vehicle
+                    with open(os.path.join(log_dir, f"{vehicle_id}_movements.txt"), "a") as save_file:
+                        # Appends the movement log into the vehicles own txt file
+                        save_file.write(
+                            f"Moved from Lat: {current_location[0]}, Long: {current_location[1]} to Lat: {new_location[0]}, Long: {new_location[1]}\n")
             else:
-                print(f"Vehicle {vehicle_id} not found")  # Prints an error message if the vehicle isn't found
+                # Error record if the vehicle isn't found
+                record = {"event": "vehicle_not_found", "vehicle_id": vehicle_id}
+                level = QUIET
+
+        # Sends the record to the output sink outside of the lock
+        self.output.emit(record, level)
 
     # Displays status of the given route on a new thread
     def display_route_status(self, route_id):
         def route_status():
-            with self.lock:  # Locks thread for safety
-
-                # Checks if the route exists
-                if route_id in self.routes:
-                    route = self.routes[route_id]  # Gets the route object
-                    print(f"Route: {route.name}")  # Prints the name of the route
+            records = self.get_route_status(route_id)  # Gets the records while holding the lock
 
-                    # Iterates through each vehicle assigned to the route
-                    for vehicle in route.get_vehicles():
-                        # Prints the details of the vehicles assigned to the given route
-                        print(f"Vehicle ID: {vehicle.get_vehicle_id()}, Location: {vehicle.get_current_location()}, "
-                              f"Status: {vehicle.get_status()}")
-                else:
-                    print("Route ID not found")  # Prints an error message if route ID is not found
+            # Sends each record to the output sink, an unknown route is reported as an error
+            level = QUIET if records[0]["event"] == "route_not_found" else NORMAL
+            for record in records:
+                self.output.emit(record, level)
 
         # Creates and starts a thread to display the route status
         display_thread = threading.Thread(target=route_status)
         display_thread.start()
 
+    # Returns the status records of the given route, followed by one record per assigned vehicle
+    def get_route_status(self, route_id):
+        with self.lock:  # Locks thread for safety
+
+            # Checks if the route exists
+            if route_id not in self.routes:
+                return [{"event": "route_not_found", "route_id": route_id}]  # Error record if route ID is not found
+
+            route = self.routes[route_id]  # Gets the route object
+            records = [{"event": "route_status", "route_id": route_id, "name": route.name,
+                        "status": route.get_status()}]
+
+            # Iterates through each vehicle assigned to the route
+            for vehicle in route.get_vehicles():
+                records.append(self._vehicle_record(vehicle, route_id))
+
+            return records
+
+    # Returns the status record of the given vehicle
+    def get_vehicle_status(self, vehicle_id):
+        with self.lock:  # Locks thread for safety
+
+            # Checks if the vehicle exists
+            if vehicle_id not in self.vehicles:
+                return {"event": "vehicle_not_found", "vehicle_id": vehicle_id}  # Error record if not found
+
+            return self._vehicle_record(self.vehicles[vehicle_id])
+
+    # Builds the status record of a vehicle
+    def _vehicle_record(self, vehicle, route_id=None):
+        location = vehicle.get_current_location()
+        record = {"event": "vehicle_status", "vehicle_id": vehicle.get_vehicle_id(),
+                  "lat": location[0], "long": location[1], "status": vehicle.get_status()}
+        if route_id is not None:  # Adds the route when the vehicle is listed as part of a route
+            record["route_id"] = route_id
+        return record
+
     # Search for a stop by its name or ID
     def search_stop(self, stop_name_or_id):
         # Iterates through each route in the system
@@ -167,23 +225,146 @@ class TransportManager:
 
         return "Route not found"  # Returns an error message if the route is not found
 
+    # Returns the random generator of the given vehicle, or the global random module if the simulation isn't seeded
+    def _vehicle_random(self, vehicle_id):
+        if vehicle_id in self.random_generators:  # Checks if the vehicle already has its own generator
+            return self.random_generators[vehicle_id]
+        if self.seed is None:
+            return random
+
+        # Derives the seed from the vehicle ID so the result doesn't depend on the order vehicles are simulated in
+        generator = random.Random(f"{self.seed}:{vehicle_id}")
+        self.random_generators[vehicle_id] = generator
+        return generator
+
+    # Sets the seed of the random generator of a single vehicle
+    def seed_vehicle(self, vehicle_id, seed):
+        self.random_generators[vehicle_id] = random.Random(seed)
+
     # Simulates vehicle movement by randomly generating locations for each vehicle and updating their locations
-    def simulate_vehicle_movement(self):
+    def simulate_vehicle_movement(self, threaded=True):
+        update_threads = []  # Threads updating the vehicle locations of this tick
+
         # Iterates through each vehicle in the system
         for vehicle_id, vehicle in self.vehicles.items():
             # Gets the current location from the vehicle
             current_lat, current_long = vehicle.get_current_location()
 
             # Updates the vehicle location randomly
-            new_lat = current_lat + random.uniform(-5, 5)  # Randomly changes the lat to simulate movement
-            new_long = current_long + random.uniform(-5, 5)  # Randomly changes the long to simulate movement
+            generator = self._vehicle_random(vehicle_id)
+            new_lat = current_lat + generator.uniform(-5, 5)  # Randomly changes the lat to simulate movement
+            new_long = current_long + generator.uniform(-5, 5)  # Randomly changes the long to simulate movement
+
+            # Records the new location in the trace
+            if self.trace is not None:
+                self.trace.record(self.tick, vehicle_id, (new_lat, new_long))
+
+            if threaded:
+                # Updates the vehicle location to the new location coordinates with a thread
+                update_thread = threading.Thread(target=self.update_and_save_vehicle_location,
+                                                 args=(vehicle_id, (new_lat, new_long)))
+                update_thread.start()
+                update_threads.append(update_thread)
+            else:
+                # Updates the vehicle location on the current thread
+                self.update_and_save_vehicle_location(vehicle_id, (new_lat, new_long))
+
+        # Waits for every update so the next tick starts from the locations of this one
+        for update_thread in update_threads:
+            update_thread.join()
+
+        self.tick += 1
+
+    # Re-applies the vehicle movements recorded in a trace file without any delay, returns the number of movements
+    def replay_trace(self, trace_file):
+        movements = 0
+
+        # Iterates through each movement recorded in the trace
+        for tick, vehicle_id, new_location in read_trace(trace_file):
+            self.update_and_save_vehicle_location(vehicle_id, new_location)
+            self.tick = tick + 1
+            movements += 1
 
-            # Updates the vehicle location to the new location coordinates with a thread
-            self.update_vehicle_location(vehicle_id, (new_lat, new_long))
+        return movements
 
+    # Flushes and closes the output sink and the trace so buffered records aren't lost, and the files of a lazy manager
+    def close(self):
+        self.output.close()
+        if self.trace is not None:
+            self.trace.close()
+        for records in (self.vehicles, self.routes):
+            if isinstance(records, LazyRecordMap):
+                records.close()
 
-def initialize_transport_manager_from_files(vehicle_file, route_file, stops_file):
-    manager = TransportManager()
+
+# Creates a Transport from a line of Vehicle.txt
+def parse_vehicle_line(line):
+    vehicle_data = line.strip().split(',')  # Splits the line by commas to extract vehicle data
+
+    # Extracts the vehicle's properties from the split data
+    vehicle_id = vehicle_data[0].strip()  # Gets vehicle ID
+    vehicle_type = vehicle_data[1].strip()  # Gets vehicle type
+    location_lat = float(vehicle_data[2].strip())  # Gets vehicle lat coord
+    location_long = float(vehicle_data[3].strip())  # Gets vehicle long coord
+    status = vehicle_data[4].strip()  # Gets vehicle status
+
+    # Creates a transport instance with the data from the line
+    return Transport(vehicle_id, vehicle_type, (location_lat, location_long), status)
+
+
+# Creates a Route from a line of Route.txt
+def parse_route_line(line):
+    route_data = line.strip().split(',')  # Splits the line by commas to extract route data
+
+    # Extracts the route's properties from the split data
+    route_id = route_data[0].strip()  # Gets the route ID
+    route_name = route_data[1].strip()  # Gets the route name
+    stops = route_data[2].strip().split('|')  # Stops seperated by char '|'
+
+    # Creates a route instance with the data from the line
+    return Route(route_id, route_name, stops)
+
+
+# Returns the state of a vehicle, used by lazy managers to keep the changes of evicted vehicles
+def vehicle_state(vehicle):
+    return (vehicle.get_vehicle_id(), vehicle.get_vehicle_type(), vehicle.get_current_location(),
+            vehicle.get_status())
+
+
+# Creates a Transport from the state returned by vehicle_state
+def vehicle_from_state(state):
+    return Transport(*state)
+
+
+# Returns the state of a route, assigned vehicles are saved by ID so they can be evicted as well
+def route_state(route):
+    return (route.route_id, route.name, tuple(route.stops), route.get_status(),
+            tuple(vehicle.get_vehicle_id() for vehicle in route.get_vehicles()))
+
+
+# Creates a Route from the state returned by route_state, looking up its vehicles in 'vehicles'
+def route_from_state(state, vehicles):
+    route_id, name, stops, status, vehicle_ids = state
+    route = Route(route_id, name, list(stops))
+    route.update_status(status)
+    for vehicle_id in vehicle_ids:
+        if vehicle_id in vehicles:  # Skips vehicles that were removed from the manager
+            route.add_vehicle(vehicles[vehicle_id])
+    return route
+
+
+# Creates a TransportManager from the txt files, with lazy=True vehicles and routes are only built when first accessed
+def initialize_transport_manager_from_files(vehicle_file, route_file, stops_file, seed=None, lazy=False,
+                                            cache_size=1024, trace=None):
+    manager = TransportManager(seed=seed, trace=trace)
+
+    if lazy:
+        # Indexes the files by byte offset, at most 'cache_size' vehicles and routes are kept in memory
+        manager.vehicles = LazyRecordMap(vehicle_file, parse_vehicle_line, vehicle_state, vehicle_from_state,
+                                         cache_size)
+        manager.routes = LazyRecordMap(route_file, parse_route_line, route_state,
+                                       lambda state: route_from_state(state, manager.vehicles), cache_size)
+        return manager  # Stops aren't kept by the manager, so there is nothing more to load
 
     # Load vehicles from Vehicle.txt
     with open(vehicle_file, 'r') as file:  # Opens the file to read
@@ -191,18 +372,7 @@ def initialize_transport_manager_from_files(vehicle_file, route_file, stops_file
 
         # Iterates through each line in the file
         for line in file:
-            vehicle_data = line.strip().split(',')  # Splits each line by commas to extract vehicle data
-
-            # Extracts each vehicle's properties from the split data
-            vehicle_id = vehicle_data[0].strip()  # Gets vehicle ID
-            vehicle_type = vehicle_data[1].strip()  # Gets vehicle type
-            location_lat = float(vehicle_data[2].strip())  # Gets vehicle lat coord
-            location_long = float(vehicle_data[3].strip())  # Gets vehicle long coord
-            status = vehicle_data[4].strip()  # Gets vehicle status
-
-            # Creates a transport instance with the data from the file
-            vehicle = Transport(vehicle_id, vehicle_type, (location_lat, location_long), status)
-            manager.add_vehicle(vehicle)  # Adds the vehicle to the TransportManager
+            manager.add_vehicle(parse_vehicle_line(line))  # Adds the vehicle to the TransportManager
 
     # Load routes from Route.txt
     with open(route_file, 'r') as file:  # Opens the file to read
@@ -210,16 +380,7 @@ def initialize_transport_manager_from_files(vehicle_file, route_file, stops_file
 
         # Iterates through each line in the file
         for line in file:
-            route_data = line.strip().split(',')  # Splits each line by commas to extract route data
-
-            # Extracts each route's properties from the split data
-            route_id = route_data[0].strip()  # Gets the route ID
-            route_name = route_data[1].strip()  # Gets the route name
-            stops = route_data[2].strip().split('|')  # Stops seperated by char '|'
-
-            # Creates a route instance with the data from the file
-            route = Route(route_id, route_name, stops)
-            manager.add_route(route)  # Adds the route to the TransportManager
+            manager.add_route(parse_route_line(line))  # Adds the route to the TransportManager
 
     # Load stops from Stops.txt
     with open(stops_file, 'r') as file:  # Opens the file to read
@@ -248,6 +409,9 @@ if __name__ == "__main__":
     manager = initialize_transport_manager_from_files("Vehicle.txt", "Route.txt", "Stops.txt")
 
     # Loops through the amount of iterations to simulate the vehicle movements
-    for _ in range(iterations):
-        manager.simulate_vehicle_movement()
-        time.sleep(5)
+    try:
+        for _ in range(iterations):
+            manager.simulate_vehicle_movement()
+            time.sleep(5)
+    finally:
+        manager.close()  # Writes any records still buffered by the output sink
@@ -1,4 +1,14 @@
+import io
+import json
+import shutil
+import warnings
+
+import pytest
+
 from TransportManager import *
+from StatusOutput import *
+from SimulationTrace import *
+from LazyIndex import OffsetIndex
 
 # Tests for all the methods in TransportManager
 
@@ -343,3 +353,348 @@ def test_vehicle_updates():
 
     thread1.join()
     thread2.join()
+
+
+def test_route_status_records():
+    manager = TransportManager(MemorySink())
+    route = Route("route1", "Route 1", ["Stop1", "Stop2"])
+    vehicle = Transport("Vehicle1", "Bus", (40.7, -67.4), "On Time")
+    manager.add_route(route)
+    manager.add_vehicle(vehicle)
+    manager.assign_vehicle_to_route("Vehicle1", "route1")
+
+    records = manager.get_route_status("route1")
+
+    assert records[0] == {"event": "route_status", "route_id": "route1", "name": "Route 1", "status": "On Time"}
+    assert records[1] == {"event": "vehicle_status", "vehicle_id": "Vehicle1", "lat": 40.7, "long": -67.4,
+                          "status": "On Time", "route_id": "route1"}
+    assert manager.get_route_status("route2") == [{"event": "route_not_found", "route_id": "route2"}]
+    assert manager.get_vehicle_status("Vehicle2") == {"event": "vehicle_not_found", "vehicle_id": "Vehicle2"}
+
+
+def test_output_sink_verbosity(tmp_path):
+    sink = MemorySink(QUIET)
+    manager = TransportManager(sink)
+    manager.log_dir = str(tmp_path)
+    manager.add_vehicle(Transport("Vehicle1", "Bus", (0, 0), "On Time"))
+
+    manager.update_and_save_vehicle_location("Vehicle1", (1, 1))
+    manager.update_and_save_vehicle_location("Vehicle2", (1, 1))
+
+    assert sink.records == [{"event": "vehicle_not_found", "vehicle_id": "Vehicle2"}]
+
+
+def test_buffered_sinks():
+    json_stream = io.StringIO()
+    csv_stream = io.StringIO()
+    json_sink = JsonLinesSink(json_stream, buffer_size=2)
+    csv_sink = CsvSink(csv_stream, buffer_size=100)
+    record = {"event": "vehicle_moved", "vehicle_id": "Vehicle1", "lat": 1.5, "long": -2.5}
+
+    json_sink.emit(record)
+    assert json_stream.getvalue() == ""
+    json_sink.emit(record)
+    assert json.loads(json_stream.getvalue().splitlines()[1]) == record
+
+    csv_sink.emit(record)
+    csv_sink.flush()
+    assert csv_stream.getvalue().splitlines() == ["event,vehicle_id,route_id,name,lat,long,status",
+                                                  "vehicle_moved,Vehicle1,,,1.5,-2.5,"]
+
+
+def test_csv_header_and_buffer_size():
+    csv_stream = io.StringIO()
+    csv_sink = CsvSink(csv_stream, buffer_size=1)
+
+    assert csv_stream.getvalue() == "event,vehicle_id,route_id,name,lat,long,status\r\n"
+    csv_sink.emit({"event": "vehicle_moved", "vehicle_id": "Vehicle1", "lat": 1.5, "long": -2.5})
+    assert csv_stream.getvalue().splitlines()[1] == "vehicle_moved,Vehicle1,,,1.5,-2.5,"
+
+
+def test_sink_close(tmp_path):
+    output_file = str(tmp_path / "status.jsonl")
+    record = {"event": "vehicle_moved", "vehicle_id": "Vehicle1", "lat": 1.5, "long": -2.5}
+
+    with JsonLinesSink(output_file) as sink:
+        sink.emit(record)
+        sink.close()
+    sink.emit(record)
+    sink.flush()
+
+    with open(output_file) as file:
+        assert [json.loads(line) for line in file] == [record]
+
+
+def test_incomplete_sink_fails_on_creation():
+    class IncompleteSink(BufferedSink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink(io.StringIO())
+
+
+def test_manager_close_flushes_output(tmp_path):
+    output_file = str(tmp_path / "status.jsonl")
+    manager = TransportManager(JsonLinesSink(output_file))
+    manager.save_movements = False
+    manager.log_dir = str(tmp_path / "movements")
+    manager.add_vehicle(Transport("Vehicle1", "Bus", (0, 0), "On Time"))
+
+    manager.update_and_save_vehicle_location("Vehicle1", (1, 1))
+    manager.close()
+
+    with open(output_file) as file:
+        assert [json.loads(line) for line in file] == [{"event": "vehicle_moved", "vehicle_id": "Vehicle1",
+                                                        "lat": 1, "long": 1}]
+    assert not os.path.exists(manager.log_dir)
+
+
+def test_console_sink_format(capsys):
+    manager = TransportManager()
+    manager.output.emit({"event": "vehicle_status", "vehicle_id": "Vehicle1", "lat": 0, "long": 0,
+                         "status": "On Time"})
+
+    assert capsys.readouterr().out == "Vehicle ID: Vehicle1, Location: (0, 0), Status: On Time\n"
+
+
+def test_seeded_simulation_is_deterministic(tmp_path):
+    locations = []
+    for threaded in (True, False):
+        manager = TransportManager(MemorySink(), seed=42)
+        manager.log_dir = str(tmp_path / str(threaded))
+        for vehicle_id in ("Vehicle1", "Vehicle2", "Vehicle3"):
+            manager.add_vehicle(Transport(vehicle_id, "Bus", (40.7, -74.0), "On Time"))
+
+        for _ in range(5):
+            manager.simulate_vehicle_movement(threaded=threaded)
+
+        locations.append({vehicle_id: vehicle.get_current_location()
+                          for vehicle_id, vehicle in manager.vehicles.items()})
+
+    assert locations[0] == locations[1]
+    assert len(set(locations[0].values())) == 3
+
+
+def test_replay_trace(tmp_path):
+    trace_file = str(tmp_path / "run.trace")
+    manager = TransportManager(MemorySink(), seed=7, trace=TraceRecorder(trace_file))
+    manager.log_dir = str(tmp_path / "recorded")
+    manager.add_vehicle(Transport("Vehicle1", "Bus", (40.7, -74.0), "On Time"))
+
+    for _ in range(3):
+        manager.simulate_vehicle_movement(threaded=False)
+    manager.close()
+    manager.close()
+
+    replayed = TransportManager(MemorySink())
+    replayed.log_dir = str(tmp_path / "replayed")
+    replayed.add_vehicle(Transport("Vehicle1", "Bus", (40.7, -74.0), "On Time"))
+
+    assert replayed.replay_trace(trace_file) == 3
+    assert replayed.tick == 3
+    assert replayed.vehicles["Vehicle1"].get_current_location() == manager.vehicles["Vehicle1"].get_current_location()
+    assert (tmp_path / "replayed" / "Vehicle1_movements.txt").read_text() == \
+           (tmp_path / "recorded" / "Vehicle1_movements.txt").read_text()
+
+
+# Copies the txt files to a temporary directory, so the index files of lazy managers aren't written to the repo
+@pytest.fixture
+def data_files(tmp_path):
+    for file_name in ("Vehicle.txt", "Route.txt", "Stops.txt"):
+        shutil.copy(file_name, tmp_path)
+    return [str(tmp_path / file_name) for file_name in ("Vehicle.txt", "Route.txt", "Stops.txt")]
+
+
+def test_lazy_initialization(data_files):
+    eager = initialize_transport_manager_from_files(*data_files)
+    manager = initialize_transport_manager_from_files(*data_files, lazy=True, cache_size=2)
+
+    assert list(manager.vehicles) == list(eager.vehicles)
+    assert len(manager.routes) == len(eager.routes)
+    assert "V101" in manager.vehicles and "V104" not in manager.vehicles
+    assert len(manager.vehicles.cache) == 0
+
+    vehicle = manager.vehicles["V102"]
+    assert vehicle.get_vehicle_type() == "Train"
+    assert vehicle.get_current_location() == (40.2191, -74.0021)
+    assert manager.routes["R102"].stops == ["Stop4", "Stop5", "Stop6"]
+    assert manager.search_route("NJ Transit Bus 158").route_id == "R103"
+    assert 5 not in manager.vehicles
+    assert manager.vehicles.get(5) is None
+    manager.close()
+
+
+def test_lazy_cache_eviction(tmp_path, data_files):
+    manager = initialize_transport_manager_from_files(*data_files, lazy=True, cache_size=2)
+    manager.output = MemorySink()
+    manager.log_dir = str(tmp_path)
+
+    manager.update_and_save_vehicle_location("V101", (1, 1))
+    manager.vehicles["V102"].set_status("Delayed")
+    manager.assign_vehicle_to_route("V103", "R101")
+    manager.routes["R101"].update_status("Early")
+    manager.simulate_vehicle_movement(threaded=False)
+    for vehicle_id in list(manager.vehicles) * 2:
+        manager.vehicles[vehicle_id]
+    for route_id in list(manager.routes) * 2:
+        manager.routes[route_id]
+
+    assert len(manager.vehicles.cache) == 2
+    assert len(manager.routes.cache) == 2
+    assert manager.vehicles["V102"].get_status() == "Delayed"
+    assert manager.vehicles["V101"].get_current_location() != (40.7128, -74.006)
+    assert manager.routes["R101"].get_status() == "Early"
+    assert [vehicle.get_vehicle_id() for vehicle in manager.routes["R101"].get_vehicles()] == ["V103"]
+
+    vehicle_count = len(manager.vehicles)
+    manager.remove_vehicle("V102")
+    manager.add_vehicle(Transport("Vehicle1", "Bus", (0, 0), "On Time"))
+    for vehicle_id in list(manager.vehicles) * 2:
+        manager.vehicles[vehicle_id]
+
+    assert "V102" not in manager.vehicles
+    assert list(manager.vehicles)[-1] == "Vehicle1"
+    assert manager.vehicles["Vehicle1"].get_current_location() == (0, 0)
+    assert len(manager.vehicles) == vehicle_count
+    manager.close()
+
+
+def test_offset_index_file(tmp_path, monkeypatch):
+    vehicle_file = tmp_path / "Vehicle.txt"
+    vehicle_file.write_text("VehicleID, Type, LocationLat, LocationLong, Status\n"
+                            "V2, Bus, 1.0, 2.0, OnTime\nV1, Train, 3.0, 4.0, Delayed\n")
+
+    index = OffsetIndex(str(vehicle_file))
+    assert list(index) == ["V2", "V1"]
+    assert index.offset("V1") == len("VehicleID, Type, LocationLat, LocationLong, Status\nV2, Bus, 1.0, 2.0, OnTime\n")
+    assert index.offset("V3") is None
+    index.close()
+
+    # The index file is reused while the source file is unchanged
+    monkeypatch.setattr("LazyIndex.scan_offsets", None)
+    index = OffsetIndex(str(vehicle_file))
+    assert index.offset("V2") == len("VehicleID, Type, LocationLat, LocationLong, Status\n")
+    index.close()
+
+    # A changed source file is indexed again
+    monkeypatch.undo()
+    with open(vehicle_file, "a") as file:
+        file.write("V3, Uber, 5.0, 6.0, Available\n")
+    index = OffsetIndex(str(vehicle_file))
+    assert list(index) == ["V2", "V1", "V3"]
+    index.close()
+
+
+def test_offset_index_without_index_file(tmp_path):
+    vehicle_file = tmp_path / "Vehicle.txt"
+    vehicle_file.write_text("VehicleID, Type, LocationLat, LocationLong, Status\nV1, Bus, 1.0, 2.0, OnTime\n")
+    index_file = tmp_path / "missing" / "Vehicle.txt.idx"
+
+    index = OffsetIndex(str(vehicle_file), str(index_file))
+
+    assert list(index) == ["V1"]
+    assert index.offset("V1") == len("VehicleID, Type, LocationLat, LocationLong, Status\n")
+    assert not index_file.parent.exists()
+    index.close()
+
+
+def test_offset_index_written_concurrently(tmp_path):
+    vehicle_file = tmp_path / "Vehicle.txt"
+    vehicle_file.write_text("VehicleID, Type, LocationLat, LocationLong, Status\n" +
+                            "".join(f"V{i}, Bus, 1.0, 2.0, OnTime\n" for i in range(1000)))
+    indexes = []
+
+    threads = [threading.Thread(target=lambda: indexes.append(OffsetIndex(str(vehicle_file)))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(indexes) == 4
+    assert all(index.offset("V999") is not None for index in indexes)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["Vehicle.txt", "Vehicle.txt.idx"]
+    for index in indexes:
+        index.close()
+
+
+def test_trajectory_summary_from_logs(tmp_path):
+    pytest.importorskip("numpy")
+    from TrajectoryAnalytics import load_movement_logs, fleet_summary, find_anomalies
+
+    manager = TransportManager(MemorySink())
+    manager.log_dir = str(tmp_path)
+    manager.add_vehicle(Transport("Vehicle1", "Bus", (0, 0), "On Time"))
+    manager.add_vehicle(Transport("Vehicle2", "Bus", (0, 0), "On Time"))
+    manager.update_and_save_vehicle_location("Vehicle1", (0, 0.001))
+    manager.update_and_save_vehicle_location("Vehicle1", (0, 0.002))
+    manager.update_and_save_vehicle_location("Vehicle2", (5, 0))
+
+    segments = load_movement_logs(str(tmp_path), tick_seconds=5.0)
+    summary = fleet_summary(segments)
+
+    assert list(summary["vehicle_id"]) == ["Vehicle1", "Vehicle2"]
+    assert list(summary["segments"]) == [2, 1]
+    assert summary["distance_km"][0] == pytest.approx(0.2224, rel=1e-3)
+    assert summary["avg_speed_kmh"][0] == pytest.approx(80.06, rel=1e-3)
+    assert list(summary["anomalies"]) == [0, 1]
+
+    anomalies = find_anomalies(segments, batch_size=1)
+    assert list(anomalies["vehicle_id"]) == ["Vehicle2"]
+    assert anomalies["distance_km"][0] == pytest.approx(555.97, rel=1e-3)
+
+
+def test_trajectory_segments_from_trace(tmp_path):
+    pytest.importorskip("numpy")
+    from TrajectoryAnalytics import load_trace, fleet_summary
+
+    trace_file = tmp_path / "run.trace"
+    trace_file.write_text("Tick, VehicleID, LocationLat, LocationLong\n"
+                          "0,Vehicle2,1.0,1.0\n0,Vehicle1,0.0,0.0\n"
+                          "1,Vehicle2,1.0,1.0\n3,Vehicle1,0.0,0.01\n")
+
+    segments = load_trace(str(trace_file), tick_seconds=5.0)
+    summary = fleet_summary(segments)
+
+    assert len(segments) == 2
+    assert list(segments.duration) == [15.0, 5.0]
+    assert list(summary["vehicle_id"]) == ["Vehicle1", "Vehicle2"]
+    assert list(summary["distance_km"] > 0) == [True, False]
+
+
+def test_trajectory_trace_matches_logs(tmp_path):
+    pytest.importorskip("numpy")
+    from TrajectoryAnalytics import load_movement_logs, load_trace, fleet_summary
+
+    vehicle_file = tmp_path / "Vehicle.txt"
+    vehicle_file.write_text("VehicleID, Type, LocationLat, LocationLong, Status\n"
+                            "V1, Bus, 40.7, -74.0, OnTime\nV2, Train, 40.2, -74.7, Delayed\n")
+    trace_file = str(tmp_path / "run.trace")
+    manager = initialize_transport_manager_from_files(str(vehicle_file), "Route.txt", "Stops.txt", seed=3,
+                                                      trace=TraceRecorder(trace_file))
+    manager.output = MemorySink()
+    manager.log_dir = str(tmp_path / "movements")
+    for _ in range(4):
+        manager.simulate_vehicle_movement(threaded=False)
+    manager.close()
+
+    from_logs = fleet_summary(load_movement_logs(manager.log_dir))
+    from_trace = fleet_summary(load_trace(trace_file, vehicle_file=str(vehicle_file)))
+
+    assert list(from_trace["segments"]) == list(from_logs["segments"]) == [4, 4]
+    assert list(from_trace["distance_km"]) == pytest.approx(list(from_logs["distance_km"]))
+    assert list(fleet_summary(load_trace(trace_file))["segments"]) == [3, 3]
+
+
+def test_trajectory_empty_trace(tmp_path):
+    pytest.importorskip("numpy")
+    from TrajectoryAnalytics import load_trace, fleet_summary
+
+    trace_file = tmp_path / "run.trace"
+    trace_file.write_text("Tick, VehicleID, LocationLat, LocationLong\n")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        segments = load_trace(str(trace_file))
+
+    assert len(segments) == 0
+    assert len(fleet_summary(segments)) == 0